@@ -1,11 +1,6 @@
-import os #to react with api keys
-import requests #access the internet and let the code talk to gemini
-from dotenv import load_dotenv #to acces the .env file with all the API's and their keys
+import cache #tracks how much of the gemini quota is left
+from settings import settings #the api keys, loaded once from the .env file
 
-# Load up environment variables.
-load_dotenv()
-
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
 
 def generate_explanation(ticker, company, risk, components):
@@ -21,8 +16,10 @@ def generate_explanation(ticker, company, risk, components):
 def find_working_model():
     #finds a usable gemini model
     try:
-        BASE_URL = f"{BASE_URL}/models?key={GEMINI_API_KEY}"
-        r = requests.get(BASE_URL, timeout=15)
+        import requests #access the internet and let the code talk to gemini, imported here since it is slow to load
+
+        url = f"{BASE_URL}/models?key={settings.gemini_api_key}"
+        r = requests.get(url, timeout=15)
         data = r.json()
 
         for model in data.get("models", []):
@@ -40,6 +37,11 @@ def find_working_model():
 
 def run_gemini(prompt: str):
     #execting the geminin prompt with a timeout feature to prevent hanging
+    #the background refresher can burn through the quota, fall back to the manual explanation
+    #before spending a request on the model list
+    if not cache.take_quota("gemini"):
+        return None
+
     model = find_working_model()
     print('Attempting AI Response...') 
     
@@ -47,7 +49,9 @@ def run_gemini(prompt: str):
         return None
     # we are forming the link that gemini needs to get the answer, gemini needs it in a specific json format
     try:
-        BASE_URL = f"{BASE_URL}/models/{model}:generateContent?key={GEMINI_API_KEY}"
+        import requests
+
+        url = f"{BASE_URL}/models/{model}:generateContent?key={settings.gemini_api_key}"
         payload = {
             "contents": [
                 {
@@ -55,7 +59,7 @@ def run_gemini(prompt: str):
                 }
             ]
         }
-        r = requests.post(BASE_URL, json=payload, timeout=20)
+        r = requests.post(url, json=payload, timeout=20)
         data = r.json()
         #checks api rerros
         if "error" in data:
@@ -1,57 +1,127 @@
+import hashlib
 from data_sources import (
     fetch_yahoo_data,
     fetch_alpha_vantage_volatility,
     fetch_fmp_metrics,
-    fetch_gnews,
-    fetch_google_news_rss,
     fetch_recent_filings,
     fetch_interest_rate,
 )
 
 from risk_engine import (
     assess_financial_risk, #looks at the yahoo data to see if the company is going broke
-    assess_news_risk, #reads the news and sees if the company or its investors and panicking
     assess_market_risk, #looks at the current interest rates
     assess_filing_risk, #checks for any issues in legal documents
     combine_risks, #takes the four previous checks and merges it into one for for final grade
 )
 
-from utils import get_company_info #to get the company name from the sticker name
+from utils import get_company_info, watchlist #to get the company name from the sticker name
 from ai import generate_explanation
-
-
-def run_analysis(ticker: str):
+import models #the typed result objects and their binary encoding
+from models import AnalysisError, AnalysisResult, Filing, NewsItem, RiskComponent, RiskSummary, StockData
+import cache #shared result cache, also filled in the background by scheduler.py
+import news_index #local headline index, news risk reads this instead of a handful of live headlines
+from settings import settings
+
+
+def cached_fetch(source: str, key: str, fetch, *args, fresh_for=0):
+    #reuses a source's last result until its refresh interval runs out, fresh_for asks
+    #for data that will still be within its interval that many seconds from now
+    value, age = cache.lookup(source, key)
+    if value is not None and age + fresh_for < settings.source_intervals[source]:
+        return value
+    #out of quota, so a stale answer beats no answer
+    if not cache.take_quota(source):
+        return value
+    #fetchers return None when the call failed, an empty answer is still an answer worth keeping
+    fresh = fetch(*args)
+    if fresh is not None:
+        cache.put(source, key, fresh)
+        return fresh
+    return value
+
+
+def get_analysis(ticker: str):
+    #what the dashboard calls, watched tickers are normally already warm in the cache
+    result, age = cache.lookup("analysis", ticker, decode=models.decode)
+    if result is not None and age > settings.source_intervals["analysis"]:
+        #the scheduler keeps watched and popular tickers warm, so a slightly old copy is about to be replaced anyway
+        watched = ticker in watchlist() or cache.view_count(ticker) >= 1
+        if not watched or age > settings.max_stale:
+            result = None
+    if result is None:
+        result = run_analysis(ticker)
+        if isinstance(result, AnalysisResult):
+            cache.put("analysis", ticker, result, encode=models.encode)
+    #only real tickers count as views, so typos never become popular
+    if isinstance(result, AnalysisResult):
+        cache.record_view(ticker)
+    return result
+
+
+def cached_explanation(ticker: str, company: str, risk: dict, components: dict):
+    #the explanation only depends on the scores and reasons, so while those haven't moved
+    #the last one is reused instead of asking gemini the same question again
+    fingerprint = hashlib.sha1(repr((company, risk, components)).encode("utf-8")).hexdigest()
+    previous, age = cache.lookup("explanation", ticker)
+    if previous and previous[0] == fingerprint and age < settings.source_intervals["explanation"]:
+        return previous[1]
+
+    explanation = generate_explanation(ticker=ticker, company=company, risk=risk, components=components)
+    cache.put("explanation", ticker, (fingerprint, explanation))
+    return explanation
+
+
+def run_analysis(ticker: str, explain: bool = True, scan: bool = False, fresh_for: int = 0):
+    #scan mode is for scoring the whole universe: it skips the quota limited providers
+    #(Alpha Vantage, FMP, GNews) for every ticker, so all scores come from the same inputs
+    #and the interactive budget is left for the dashboard and the scheduler.
+    #fresh_for is how long the result will be served, the scheduler refreshes ahead of
+    #expiry and passes the analysis interval so no source outlives the entry it feeds
 
     # Resolve company info
     company_name, cik, sec_status = get_company_info(ticker)
 
     if not company_name or not cik:
-        return {"error": sec_status}
+        return AnalysisError(sec_status)
 
-    #getting the data
-    yahoo_data = fetch_yahoo_data(ticker)
+    #getting the data, and keeping track of any source that failed with nothing cached to fall back on
+    missing = []
+    yahoo_data = cached_fetch("yahoo", ticker, fetch_yahoo_data, ticker, fresh_for=fresh_for)
+    if yahoo_data is None:
+        missing.append("yahoo")
+    yahoo_data = yahoo_data or {}
 
-    av_volatility = fetch_alpha_vantage_volatility(ticker)
+    av_volatility = None if scan else cached_fetch(
+        "alpha_vantage", ticker, fetch_alpha_vantage_volatility, ticker, fresh_for=fresh_for
+    )
     volatility = av_volatility or yahoo_data.get("yahoo_volatility")
     volatility_source = (
         "Alpha Vantage" if av_volatility else "Yahoo Finance"
     )
 
-    yahoo_data["volatility"] = volatility
-    yahoo_data["volatility_source"] = volatility_source
-
-    fmp_data = fetch_fmp_metrics(ticker)
-
-    news_gnews = fetch_gnews(company_name)
-    news_rss = fetch_google_news_rss(company_name)
-    all_news = news_gnews + news_rss
-
-    filings = fetch_recent_filings(cik)
-    interest_rate = fetch_interest_rate()
+    fmp_data = {} if scan else cached_fetch("fmp", ticker, fetch_fmp_metrics, ticker, fresh_for=fresh_for)
+    if fmp_data is None:
+        missing.append("fmp")
+    fmp_data = fmp_data or {}
+
+    feeds = ("rss",) if scan else news_index.FEEDS
+    news_index.ensure_fresh(company_name, feeds, fresh_for)
+    if len(news_index.stale_feeds(company_name, feeds)) == len(feeds):
+        missing.append("news")
+    all_news = news_index.recent_headlines(company_name, rss_only=scan)
+
+    filings = cached_fetch("filings", cik, fetch_recent_filings, cik, fresh_for=fresh_for)
+    if filings is None:
+        missing.append("filings")
+    filings = filings or []
+    interest_rate = cached_fetch("interest_rate", "FEDFUNDS", fetch_interest_rate, fresh_for=fresh_for)
+    if interest_rate is None:
+        missing.append("interest_rate")
+        interest_rate = 4.5 # Default fallback
 
    #assesin all the risks
     financial_risk = assess_financial_risk(yahoo_data, fmp_data)
-    news_risk = assess_news_risk(all_news)
+    news_risk = news_index.assess_news_risk(company_name, rss_only=scan) #reads the news and sees if the company or its investors and panicking
     market_risk = assess_market_risk(interest_rate)
     filing_risk = assess_filing_risk(filings)
 
@@ -62,31 +132,49 @@ def run_analysis(ticker: str):
         filing_risk
     )
 
-    #the ai explanetions using all the data fetched
-    explanation = generate_explanation(
-        ticker=ticker,
-        company=company_name,
-        risk=final_risk,
-        components={
-            "financial": financial_risk,
-            "news": news_risk,
-            "market": market_risk,
-            "filings": filing_risk
-        }
+    #the ai explanetions using all the data fetched, a universe scan skips this since it only needs the scores
+    explanation = ""
+    if explain:
+        explanation = cached_explanation(
+            ticker=ticker,
+            company=company_name,
+            risk=final_risk,
+            components={
+                "financial": financial_risk,
+                "news": news_risk,
+                "market": market_risk,
+                "filings": filing_risk
+            }
+        )
+
+    stock = StockData(
+        current_price=yahoo_data.get("current_price"),
+        pe_ratio=yahoo_data.get("pe_ratio"),
+        debt_to_equity=yahoo_data.get("debt_to_equity"),
+        yahoo_volatility=yahoo_data.get("yahoo_volatility", 0.0),
+        volatility=volatility,
+        volatility_source=volatility_source,
     )
+    if "price_dates" in yahoo_data:
+        stock.price_dates = yahoo_data["price_dates"]
+        stock.price_closes = yahoo_data["price_closes"]
 
-    return {
-        "ticker": ticker,
-        "company_name": company_name,
-        "stock_data": yahoo_data,
-        "risk": final_risk,
-        "risk_components": {
-            "Financial": financial_risk["score"],
-            "News": news_risk["score"],
-            "Market": market_risk["score"],
-            "Filings": filing_risk["score"],
+    return AnalysisResult(
+        ticker=ticker,
+        company_name=company_name,
+        stock=stock,
+        risk=RiskSummary(final_risk["risk_level"], final_risk["total_score"], tuple(final_risk["reasons"])),
+        components={
+            name: RiskComponent(risk["score"], tuple(risk["reasons"]))
+            for name, risk in (
+                ("Financial", financial_risk),
+                ("News", news_risk),
+                ("Market", market_risk),
+                ("Filings", filing_risk),
+            )
         },
-        "news": all_news,
-        "filings": filings,
-        "explanation": explanation,
-    }
+        news=tuple(NewsItem(**article) for article in all_news),
+        filings=tuple(Filing(**f) for f in filings),
+        explanation=explanation,
+        missing=tuple(missing),
+    )
@@ -1,8 +1,8 @@
 import streamlit as st #used for turning python into websites easily
-import pandas as pd #used for data manipulation
-import plotly.express as px #used for prccesing the graphs and pie charts
-import plotly.graph_objects as go
-from analysis import run_analysis #returns the analysis from analysis.py so that it can be displayed on streamlit
+from settings import settings
+from utils import downsample_lttb
+from analysis import get_analysis #returns the analysis from analysis.py (or the shared cache) so that it can be displayed on streamlit
+from models import AnalysisError
 
 #starting the page using streamlit
 st.set_page_config(
@@ -37,6 +37,15 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+#keeps the watchlist warm inside the app, skip this when running scheduler.py as its own worker
+@st.cache_resource(show_spinner=False)
+def start_refresh_scheduler():
+    from scheduler import RefreshScheduler
+    return RefreshScheduler().start()
+
+if settings.background_refresh:
+    start_refresh_scheduler()
+
 #sidebar
 with st.sidebar:
     st.title("🛡️ Specter Risk Analyzer")
@@ -69,18 +78,25 @@ if analyze_btn or ticker:
         st.stop()
         
     with st.spinner(f"Analyzing {ticker}..."):
-        result = run_analysis(ticker)
+        result = get_analysis(ticker)
 
-    if "error" in result:
-        st.error(result["error"])
+    if isinstance(result, AnalysisError):
+        st.error(result.message)
         st.stop()
 
+    if result.missing:
+        st.warning(f"Some data sources could not be reached, so this score may understate risk: {', '.join(result.missing)}")
+
+    #pandas and plotly are only needed once there is something to chart, so the landing card loads without them
+    import pandas as pd #used for data manipulation
+    import plotly.express as px #used for prccesing the graphs and pie charts
+
     #header and score
     with st.container():
-        st.subheader(f"{result['company_name']} ({result['ticker']})")
+        st.subheader(f"{result.company_name} ({result.ticker})")
         
         # Risk Badge Logic
-        risk_level = result["risk"]["risk_level"]
+        risk_level = result.risk.risk_level
         if risk_level == "High":
             risk_color_hex = "#ff4b4b" # Red
         elif risk_level == "Medium":
@@ -103,7 +119,7 @@ if analyze_btn or ticker:
             st.markdown(f"""
                 <div style="text-align: left;">
                     <p class="risk-label">RISK SCORE</p>
-                    <p class="risk-metric" style="color: {risk_color_hex};">{result['risk']['total_score']}/10</p>
+                    <p class="risk-metric" style="color: {risk_color_hex};">{result.risk.total_score}/10</p>
                 </div>
             """, unsafe_allow_html=True)
 
@@ -111,12 +127,12 @@ if analyze_btn or ticker:
 
     #ai explenation
     st.subheader("🤖 AI Risk Analysis")
-    st.info(result["explanation"])
+    st.info(result.explanation)
 
     #the visuals
     st.subheader("Risk Factors")
     
-    components = result.get("risk_components", {})
+    components = result.component_scores
     if components and sum(components.values()) > 0:
         df_risk = pd.DataFrame({
             "Risk Category": components.keys(),
@@ -148,23 +164,26 @@ if analyze_btn or ticker:
     #key financials
     st.subheader("Key Financials")
     
-    stock = result["stock_data"]
+    stock = result.stock
     
     #the colum layout
     m1, m2, m3 = st.columns(3)
-    m1.metric("Price", f"${stock.get('current_price', 'N/A')}")
-    m2.metric("P/E Ratio", stock.get('pe_ratio', 'N/A'))
-    m3.metric("Debt/Equity", stock.get('debt_to_equity', 'N/A'))
+    m1.metric("Price", f"${stock.current_price if stock.current_price is not None else 'N/A'}")
+    m2.metric("P/E Ratio", stock.pe_ratio if stock.pe_ratio is not None else 'N/A')
+    m3.metric("Debt/Equity", stock.debt_to_equity if stock.debt_to_equity is not None else 'N/A')
 
     #the volatility
-    vol = stock.get("yahoo_volatility", 0)
-    st.caption(f"Annualized Volatility: {vol:.2f} (Source: {stock.get('volatility_source', 'Yahoo')})")
+    vol = stock.yahoo_volatility or 0
+    st.caption(f"Annualized Volatility: {vol:.2f} (Source: {stock.volatility_source})")
 
     #the price chart
-    price_history = stock.get("price_history")
-    if price_history:
-        df_price = pd.DataFrame(price_history.items(), columns=["Date", "Price"])
-        df_price["Date"] = pd.to_datetime(df_price["Date"])
+    if stock.price_closes:
+        #long histories are thinned out here so the browser isn't sent every raw price point
+        dates, closes = downsample_lttb(stock.price_dates, stock.price_closes, settings.chart_max_points)
+        df_price = pd.DataFrame({
+            "Date": pd.to_datetime(dates, unit="s"),
+            "Price": closes
+        })
         
         fig_price = px.area(
             df_price, x="Date", y="Price", 
@@ -185,20 +204,20 @@ if analyze_btn or ticker:
     tab1, tab2 = st.tabs(["📰 Recent News", "⚖️ SEC Filings"])
 
     with tab1:
-        news = result.get("news", [])
+        news = result.news
         if news:
             for article in news[:5]:
-                with st.expander(f"{article['title']}"):
-                    st.write(f"Source: {article.get('source', 'Unknown')}")
-                    st.markdown(f"[Read Article]({article['url']})")
+                with st.expander(f"{article.title}"):
+                    st.write(f"Source: {article.source}")
+                    st.markdown(f"[Read Article]({article.url})")
         else:
             st.info("No major news headlines found.")
 
     with tab2:
-        filings = result.get("filings", [])
+        filings = result.filings
         if filings:
             for f in filings[:5]:
-                st.write(f"**{f['form']}** filed on {f['date']}")
+                st.write(f"**{f.form}** filed on {f.date}")
         else:
             st.info("No recent 8-K filings found.")
 
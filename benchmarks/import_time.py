@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+#run from anywhere: python benchmarks/import_time.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#what each entry point imports before it can do anything useful
+TARGETS = {
+    "settings": "import settings",
+    "analysis (worker)": "import analysis",
+    "scheduler (worker)": "import scheduler",
+    "scan (worker)": "import scan",
+    "streamlit cold start": "import streamlit, analysis",
+}
+
+#these should only load on the code paths that actually use them
+HEAVY_MODULES = ["pandas", "plotly", "yfinance", "numpy", "requests", "streamlit"]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+import json
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement: str, runs: int):
+    #every run is a fresh interpreter, so nothing is already sitting in sys.modules
+    timings = []
+    loaded = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1:]
+        data = json.loads(out.stdout.strip().splitlines()[-1])
+        timings.append(data["ms"])
+        loaded = data["loaded"]
+    return statistics.median(timings), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time of the Specter entry points")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if a worker import is slower than this")
+    args = parser.parse_args()
+
+    failed = False
+    for name, statement in TARGETS.items():
+        ms, loaded = measure(statement, args.runs)
+        if ms is None:
+            print(f"{name:<24} error: {' '.join(loaded)}")
+            continue
+        heavy = ", ".join(m for m in loaded if m not in statement) or "-"
+        print(f"{name:<24} {ms:8.1f} ms   heavy modules loaded: {heavy}")
+        if args.max_ms is not None and "worker" in name and ms > args.max_ms:
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
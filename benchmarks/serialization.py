@@ -0,0 +1,119 @@
+import argparse
+import os
+import pickle
+import sys
+import time
+from array import array
+
+#run from anywhere: python benchmarks/serialization.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models
+
+DAY = 24 * 60 * 60
+START = 1_700_000_000
+
+
+def sample_result(points: int):
+    #a typical dashboard result: a year of closes, ten headlines, five filings and an AI explanation
+    dates = [START + i * DAY for i in range(points)]
+    closes = [150 + (i % 37) * 0.73 for i in range(points)]
+    return models.AnalysisResult(
+        ticker="AAPL",
+        company_name="Apple Inc.",
+        stock=models.StockData(
+            current_price=187.44,
+            pe_ratio=29.1,
+            debt_to_equity=145.2,
+            yahoo_volatility=0.23,
+            volatility=0.23,
+            volatility_source="Yahoo Finance",
+            price_dates=array("d", dates),
+            price_closes=array("d", closes),
+        ),
+        risk=models.RiskSummary("Medium", 4, ("High debt-to-equity ratio", "High interest rate environment")),
+        components={
+            "Financial": models.RiskComponent(2, ("High debt-to-equity ratio",)),
+            "News": models.RiskComponent(1, ("Some negative news coverage detected",)),
+            "Market": models.RiskComponent(1, ("High interest rate environment",)),
+            "Filings": models.RiskComponent(0),
+        },
+        news=tuple(
+            models.NewsItem(f"Apple headline number {i} about the quarter", f"https://example.com/{i}", "Reuters", START)
+            for i in range(10)
+        ),
+        filings=tuple(models.Filing("8-K", "2024-01-0%d" % (i + 1)) for i in range(5)),
+        explanation="Apple is classified as medium risk. " * 40,
+    )
+
+
+def legacy_dict(result):
+    #the plain dict run_analysis used to return, with a Timestamp keyed price history
+    import pandas as pd
+
+    stock = result.stock
+    return {
+        "ticker": result.ticker,
+        "company_name": result.company_name,
+        "stock_data": {
+            "current_price": stock.current_price,
+            "pe_ratio": stock.pe_ratio,
+            "debt_to_equity": stock.debt_to_equity,
+            "yahoo_volatility": stock.yahoo_volatility,
+            "volatility": stock.volatility,
+            "volatility_source": stock.volatility_source,
+            "price_history": {
+                pd.Timestamp(d, unit="s", tz="America/New_York"): c
+                for d, c in zip(stock.price_dates, stock.price_closes)
+            },
+        },
+        "risk": {
+            "risk_level": result.risk.risk_level,
+            "total_score": result.risk.total_score,
+            "reasons": list(result.risk.reasons),
+        },
+        "risk_components": result.component_scores,
+        "news": [{"title": n.title, "url": n.url, "source": n.source} for n in result.news],
+        "filings": [{"form": f.form, "date": f.date} for f in result.filings],
+        "explanation": result.explanation,
+    }
+
+
+def per_call_us(fn, runs: int):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cached result size and round trip time, msgpack models vs the old pickled dict")
+    parser.add_argument("--points", type=int, default=252, help="price points in the sample (252 is one year)")
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+
+    result = sample_result(args.points)
+    old = legacy_dict(result)
+
+    encoded = models.encode(result)
+    pickled = pickle.dumps(old, protocol=pickle.HIGHEST_PROTOCOL)
+    assert models.decode(encoded) == result
+
+    rows = [
+        ("models (msgpack)", len(encoded), per_call_us(lambda: models.encode(result), args.runs),
+         per_call_us(lambda: models.decode(encoded), args.runs)),
+        ("legacy dict (pickle)", len(pickled),
+         per_call_us(lambda: pickle.dumps(old, protocol=pickle.HIGHEST_PROTOCOL), args.runs),
+         per_call_us(lambda: pickle.loads(pickled), args.runs)),
+    ]
+
+    print(f"{'format':<22} {'bytes':>8} {'encode us':>10} {'decode us':>10}")
+    for name, size, enc, dec in rows:
+        print(f"{name:<22} {size:>8} {enc:>10.1f} {dec:>10.1f}")
+
+    new, legacy = rows[0], rows[1]
+    print(f"\nsize: {new[1] / legacy[1]:.0%} of legacy, round trip: {(legacy[2] + legacy[3]) / (new[2] + new[3]):.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import pickle #turns python objects into bytes so they can be stored
+import sqlite3 #a small database file that the app and the worker can both read
+import threading
+import time
+
+from settings import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS views (
+    ticker TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quota (
+    provider TEXT PRIMARY KEY,
+    window_start REAL NOT NULL,
+    used INTEGER NOT NULL
+);
+"""
+
+_local = threading.local()
+
+
+def _connect():
+    #one connection per thread, sqlite connections can't be shared between threads
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(settings.cache_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL") #lets the dashboard read while the worker writes
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def _pickle(value):
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def lookup(namespace: str, key: str, decode=pickle.loads):
+    #returns (value, age in seconds), or (None, None) when nothing is stored or it can't be read
+    row = _connect().execute(
+        "SELECT value, updated FROM entries WHERE namespace = ? AND key = ?",
+        (namespace, key),
+    ).fetchone()
+    if row is None:
+        return None, None
+    try:
+        return decode(row[0]), time.time() - row[1]
+    except Exception:
+        return None, None
+
+
+def put(namespace: str, key: str, value, encode=_pickle):
+    _connect().execute(
+        "INSERT OR REPLACE INTO entries (namespace, key, value, updated) VALUES (?, ?, ?, ?)",
+        (namespace, key, encode(value), time.time()),
+    )
+
+
+def age(namespace: str, key: str):
+    row = _connect().execute(
+        "SELECT updated FROM entries WHERE namespace = ? AND key = ?",
+        (namespace, key),
+    ).fetchone()
+    return None if row is None else time.time() - row[0]
+
+
+def _popular_since():
+    return time.time() - settings.popular_window
+
+
+def record_view(ticker: str):
+    #counts dashboard lookups so the scheduler knows which tickers are popular,
+    #the count starts over when nobody has looked at the ticker for a whole window
+    _connect().execute(
+        "INSERT INTO views (ticker, hits, last_seen) VALUES (?, 1, ?) "
+        "ON CONFLICT(ticker) DO UPDATE SET "
+        "hits = CASE WHEN last_seen < ? THEN 1 ELSE hits + 1 END, last_seen = excluded.last_seen",
+        (ticker, time.time(), _popular_since()),
+    )
+
+
+def view_count(ticker: str):
+    row = _connect().execute(
+        "SELECT hits FROM views WHERE ticker = ? AND last_seen >= ?", (ticker, _popular_since())
+    ).fetchone()
+    return 0 if row is None else row[0]
+
+
+def popular_tickers():
+    #tickers viewed more than once within the window, capped so the scheduler's load can't grow without bound
+    return dict(_connect().execute(
+        "SELECT ticker, hits FROM views WHERE hits > 1 AND last_seen >= ? ORDER BY hits DESC LIMIT ?",
+        (_popular_since(), settings.popular_max),
+    ).fetchall())
+
+
+def take_quota(provider: str):
+    #uses up one call from the provider's budget, returns False once the window is spent
+    if provider not in settings.provider_quotas:
+        return True
+    limit, window = settings.provider_quotas[provider]
+    now = time.time()
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE") #the worker and the dashboard may both be spending the budget
+    try:
+        row = conn.execute(
+            "SELECT window_start, used FROM quota WHERE provider = ?", (provider,)
+        ).fetchone()
+        if row is None or now - row[0] >= window:
+            row = (now, 0)
+        allowed = row[1] < limit
+        if allowed:
+            conn.execute(
+                "INSERT OR REPLACE INTO quota (provider, window_start, used) VALUES (?, ?, ?)",
+                (provider, row[0], row[1] + 1),
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return allowed
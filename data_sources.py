@@ -1,31 +1,65 @@
 import os
-import requests
-import feedparser
-import yfinance as yf
-import numpy as np
+import threading
+import time
+from array import array
 from urllib.parse import quote_plus
-from dotenv import load_dotenv
+from settings import settings
 
-load_dotenv()
-
-# Use UPPERCASE to match your .env file
-ALPHA_VANTAGE_KEY = os.getenv("ALPHA_VANTAGE_KEY")
-FMP_KEY = os.getenv("FMP_KEY")
-GNEWS_KEY = os.getenv("GNEWS_KEY")
-FRED_KEY = os.getenv("FRED_KEY")
+#requests, yfinance and numpy are slow to import, so each fetcher
+#imports what it needs when it first runs instead of at start up
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
+_session = None
+_session_pid = None
+
+def http():
+    #one pooled session per process so connections get reused across tickers,
+    #a forked scan worker builds its own instead of sharing the parent's sockets
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(pool_connections=settings.http_pool_size, pool_maxsize=settings.http_pool_size)
+        _session = requests.Session()
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+        _session_pid = os.getpid()
+    return _session
+
+_sec_lock = threading.Lock()
+_sec_next = 0.0
+_sec_rate = settings.sec_requests_per_second
+
+def set_sec_rate(per_second: float):
+    #scan workers each get their share of SEC's limit so all the processes together stay under it
+    global _sec_rate
+    _sec_rate = per_second
+
+def _sec_throttle():
+    #data.sec.gov blocks IPs that go over its fair-access limit, so requests are spaced out
+    global _sec_next
+    with _sec_lock:
+        now = time.monotonic()
+        wait = _sec_next - now
+        _sec_next = max(now, _sec_next) + 1 / _sec_rate
+    if wait > 0:
+        time.sleep(wait)
+
 def fetch_yahoo_data(ticker: str):
     try:
+        import numpy as np
+        import yfinance as yf
+
         stock = yf.Ticker(ticker)
         current_price = stock.fast_info.last_price 
         if not current_price:
             current_price = stock.info.get("currentPrice")
 
-        hist = stock.history(period="1y")
+        hist = stock.history(period=settings.price_history_period)
         price_history = hist["Close"].dropna()
 
         yahoo_volatility = 0.0
@@ -43,18 +77,22 @@ def fetch_yahoo_data(ticker: str):
             "pe_ratio": pe,
             "debt_to_equity": stock.info.get("debtToEquity"),
             "yahoo_volatility": yahoo_volatility,
-            "price_history": price_history.to_dict() # Added price_history to return for chart
+            # Added price history for the chart, as plain arrays so cached copies load without pandas
+            "price_dates": array("d", (t.timestamp() for t in price_history.index)),
+            "price_closes": array("d", price_history.tolist()),
         }
     except Exception as e:
         print(f"Yahoo Error: {e}")
-        return {}
+        return None
 
 def fetch_alpha_vantage_volatility(ticker: str):
-    if not ALPHA_VANTAGE_KEY:
+    if not settings.alpha_vantage_key:
         return None
-    url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY_ADJUSTED&symbol={ticker}&apikey={ALPHA_VANTAGE_KEY}"
+    url = f"https://www.alphavantage.co/query?function=TIME_SERIES_DAILY_ADJUSTED&symbol={ticker}&apikey={settings.alpha_vantage_key}"
     try:
-        r = requests.get(url, timeout=10)
+        import numpy as np
+
+        r = http().get(url, timeout=10)
         data = r.json()
         prices = [float(v["4. close"]) for v in data.get("Time Series (Daily)", {}).values()]
         if len(prices) < 2: return None
@@ -64,43 +102,92 @@ def fetch_alpha_vantage_volatility(ticker: str):
         return None
 
 def fetch_fmp_metrics(ticker: str):
-    if not FMP_KEY:
+    if not settings.fmp_key:
         return {}
-    url = f"https://financialmodelingprep.com/api/v3/key-metrics/{ticker}?apikey={FMP_KEY}"
+    url = f"https://financialmodelingprep.com/api/v3/key-metrics/{ticker}?apikey={settings.fmp_key}"
     try:
-        r = requests.get(url, timeout=10)
+        r = http().get(url, timeout=10)
         data = r.json()
+        if isinstance(data, dict) and "Error Message" in data: return None
         return data[0] if isinstance(data, list) and data else {}
     except Exception:
-        return {}
+        return None
+
+def _timestamp(published: str):
+    #gnews sends ISO dates, rss sends RFC 822 dates, the headline index wants unix time
+    from datetime import datetime
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return datetime.fromisoformat(published.replace("Z", "+00:00")).timestamp()
+    except Exception:
+        pass
+    try:
+        return parsedate_to_datetime(published).timestamp()
+    except Exception:
+        return None
 
-def fetch_gnews(company_name: str):
-    if not GNEWS_KEY:
-        return []
-    url = f"https://gnews.io/api/v4/search?q={quote_plus(company_name)}&lang=en&token={GNEWS_KEY}"
+def fetch_gnews_articles(company_name: str):
+    #every article gnews returns for the company, for the headline index (None when gnews didn't answer)
+    if not settings.gnews_key:
+        return None
+    url = f"https://gnews.io/api/v4/search?q={quote_plus(company_name)}&lang=en&token={settings.gnews_key}"
     try:
-        r = requests.get(url, timeout=5)
-        if r.status_code != 200: return []
+        r = http().get(url, timeout=5)
+        if r.status_code != 200: return None
         data = r.json()
-        return [{"title": a["title"], "url": a["url"], "source": a["source"]["name"]} for a in data.get("articles", [])[:3]]
+        return [
+            {
+                "title": a["title"],
+                "url": a["url"],
+                "source": a["source"]["name"],
+                "published": _timestamp(a.get("publishedAt") or ""),
+            }
+            for a in data.get("articles", [])
+        ]
     except Exception:
-        return []
+        return None
+
+def strip_publisher(title: str, publisher: str):
+    #google news rss ends every title with " - Publisher" and gnews doesn't,
+    #the headline index dedupes on the title so the suffix has to go
+    suffix = f" - {publisher}" if publisher else ""
+    if suffix and title.endswith(suffix):
+        return title[: -len(suffix)].rstrip()
+    return title
 
-def fetch_google_news_rss(company_name: str):
+def parse_rss(stream):
+    #yields each item as soon as its closing tag arrives, so the feed is parsed while it downloads
+    from xml.etree.ElementTree import iterparse
+
+    for _, item in iterparse(stream, events=("end",)):
+        if item.tag != "item":
+            continue
+        publisher = item.findtext("source")
+        yield {
+            "title": strip_publisher(item.findtext("title", ""), publisher),
+            "url": item.findtext("link", ""),
+            "source": publisher or "Google News",
+            "published": _timestamp(item.findtext("pubDate", "")),
+        }
+        item.clear() #keeps memory flat on long feeds
+
+def stream_google_news_rss(company_name: str):
+    #yields every item in the feed while it is still downloading, instead of parsing the whole thing at the end.
+    #errors are raised rather than swallowed, so the index can tell a failed pull from an empty feed
     query = quote_plus(company_name)
     feed_url = f"https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
-    try:
-        response = requests.get(feed_url, headers=HEADERS, timeout=10)
-        feed = feedparser.parse(response.content)
-        return [{"title": e.title, "url": e.link, "source": "Google News"} for e in feed.entries[:3]]
-    except Exception:
-        return []
+    with http().get(feed_url, headers=HEADERS, timeout=10, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        yield from parse_rss(response.raw)
 
 def fetch_recent_filings(cik: str):
     url = f"https://data.sec.gov/submissions/CIK{cik}.json"
     try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
-        if r.status_code != 200: return []
+        _sec_throttle()
+        r = http().get(url, headers=HEADERS, timeout=10)
+        if r.status_code != 200: return None
         data = r.json()
         recent = data.get("filings", {}).get("recent", {})
         filings = []
@@ -109,14 +196,14 @@ def fetch_recent_filings(cik: str):
                 filings.append({"form": form, "date": date})
         return filings[:5]
     except Exception:
-        return []
+        return None
 
 def fetch_interest_rate():
-    if not FRED_KEY: return 4.5 # Default fallback
-    url = f"https://api.stlouisfed.org/fred/series/observations?series_id=FEDFUNDS&api_key={FRED_KEY}&file_type=json"
+    if not settings.fred_key: return 4.5 # Default fallback
+    url = f"https://api.stlouisfed.org/fred/series/observations?series_id=FEDFUNDS&api_key={settings.fred_key}&file_type=json"
     try:
-        r = requests.get(url, timeout=10)
+        r = http().get(url, timeout=10)
         data = r.json()
         return float(data["observations"][-1]["value"])
     except Exception:
-        return 4.5
+        return None
@@ -0,0 +1,136 @@
+import sys
+from array import array #compact typed arrays, one machine double per price point
+from dataclasses import dataclass, field
+
+#bump this whenever the encoded layout changes, old cache entries are then refetched instead of misread
+FORMAT_VERSION = 2
+
+
+@dataclass(slots=True)
+class RiskComponent:
+    score: int
+    reasons: tuple = ()
+
+
+@dataclass(slots=True)
+class RiskSummary:
+    risk_level: str
+    total_score: int
+    reasons: tuple = ()
+
+
+@dataclass(slots=True)
+class NewsItem:
+    title: str
+    url: str = ""
+    source: str = "Unknown"
+    published: float = None
+
+
+@dataclass(slots=True)
+class Filing:
+    form: str
+    date: str
+
+
+@dataclass(slots=True)
+class StockData:
+    current_price: float = None
+    pe_ratio: float = None
+    debt_to_equity: float = None
+    yahoo_volatility: float = 0.0
+    volatility: float = None
+    volatility_source: str = "Yahoo Finance"
+    price_dates: array = field(default_factory=lambda: array("d")) #unix seconds
+    price_closes: array = field(default_factory=lambda: array("d"))
+
+
+@dataclass(slots=True)
+class AnalysisResult:
+    ticker: str
+    company_name: str
+    stock: StockData
+    risk: RiskSummary
+    components: dict #"Financial", "News", "Market", "Filings" -> RiskComponent
+    news: tuple = ()
+    filings: tuple = ()
+    explanation: str = ""
+    missing: tuple = () #sources that failed with nothing cached to fall back on
+
+    @property
+    def component_scores(self):
+        return {name: component.score for name, component in self.components.items()}
+
+
+@dataclass(slots=True)
+class AnalysisError:
+    message: str
+
+
+def _array_bytes(values: array):
+    #always little endian on the wire so any machine can read what another wrote
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _array_from(data: bytes):
+    values = array("d")
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def encode(result: AnalysisResult):
+    #positional msgpack lists, no field names repeated in every cached ticker
+    import msgpack
+
+    stock = result.stock
+    return msgpack.packb(
+        [
+            FORMAT_VERSION,
+            result.ticker,
+            result.company_name,
+            [
+                stock.current_price,
+                stock.pe_ratio,
+                stock.debt_to_equity,
+                stock.yahoo_volatility,
+                stock.volatility,
+                stock.volatility_source,
+                _array_bytes(stock.price_dates),
+                _array_bytes(stock.price_closes),
+            ],
+            [result.risk.risk_level, result.risk.total_score, list(result.risk.reasons)],
+            [[name, c.score, list(c.reasons)] for name, c in result.components.items()],
+            [[n.title, n.url, n.source, n.published] for n in result.news],
+            [[f.form, f.date] for f in result.filings],
+            result.explanation,
+            list(result.missing),
+        ],
+        use_bin_type=True,
+    )
+
+
+def decode(data: bytes):
+    import msgpack
+
+    fields = msgpack.unpackb(data, raw=False)
+    if fields[0] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported result format version: {fields[0]}")
+
+    _, ticker, company_name, stock, risk, components, news, filings, explanation, missing = fields
+    *stock_fields, price_dates, price_closes = stock
+    return AnalysisResult(
+        ticker=ticker,
+        company_name=company_name,
+        stock=StockData(*stock_fields, _array_from(price_dates), _array_from(price_closes)),
+        risk=RiskSummary(risk[0], risk[1], tuple(risk[2])),
+        components={name: RiskComponent(score, tuple(reasons)) for name, score, reasons in components},
+        news=tuple(NewsItem(*n) for n in news),
+        filings=tuple(Filing(*f) for f in filings),
+        explanation=explanation,
+        missing=tuple(missing),
+    )
@@ -0,0 +1,271 @@
+import hashlib
+import sqlite3 #sqlite's FTS5 gives us a full-text index without running a search server
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import cache #the gnews quota is shared with the rest of the app
+from data_sources import fetch_gnews_articles, parse_rss, stream_google_news_rss
+from risk_engine import NEGATIVE_NEWS_KEYWORDS, score_news_hits
+from settings import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    url TEXT,
+    source TEXT,
+    published REAL NOT NULL,
+    via_rss INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS articles_published ON articles (published);
+CREATE TABLE IF NOT EXISTS mentions (
+    company TEXT NOT NULL,
+    article INTEGER NOT NULL,
+    PRIMARY KEY (company, article)
+);
+CREATE INDEX IF NOT EXISTS mentions_article ON mentions (article);
+CREATE TABLE IF NOT EXISTS ingested (
+    company TEXT NOT NULL,
+    feed TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (company, feed)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS headlines USING fts5(title, content='articles', content_rowid='id');
+"""
+
+#gnews is quota limited, rss is not, so a universe scan only uses rss
+FEEDS = ("gnews", "rss")
+
+#prefix match so "lawsuit" also catches "lawsuits"
+NEGATIVE_QUERY = " OR ".join(f"{word}*" for word in NEGATIVE_NEWS_KEYWORDS)
+
+_local = threading.local()
+
+
+def _connect():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(settings.news_index_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _local.conn = conn
+    return conn
+
+
+def headline_hash(title: str):
+    #the same story shows up on gnews and rss with different urls, so dedupe on the normalized title
+    normalized = " ".join(title.lower().split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _window_start(days=None):
+    return time.time() - (days or settings.news_window_days) * 24 * 60 * 60
+
+
+def store(company: str, articles, feed: str = "rss"):
+    conn = _connect()
+    now = time.time()
+    since = _window_start()
+    added = 0
+    with conn:
+        for article in articles:
+            title = (article.get("title") or "").strip()
+            published = article.get("published") or now
+            #anything older than the window would only be pruned again on the next ingest
+            if not title or published < since:
+                continue
+            digest = headline_hash(title)
+            via_rss = int(feed == "rss")
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO articles (hash, title, url, source, published, via_rss) VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, title, article.get("url"), article.get("source"), published, via_rss),
+            )
+            if cur.rowcount:
+                article_id = cur.lastrowid
+                conn.execute("INSERT INTO headlines (rowid, title) VALUES (?, ?)", (article_id, title))
+                added += 1
+            else:
+                article_id = conn.execute("SELECT id FROM articles WHERE hash = ?", (digest,)).fetchone()[0]
+                if via_rss:
+                    #a gnews headline that rss also carries counts for rss-only scoring too
+                    conn.execute("UPDATE articles SET via_rss = 1 WHERE id = ?", (article_id,))
+            conn.execute("INSERT OR IGNORE INTO mentions (company, article) VALUES (?, ?)", (company, article_id))
+    return added
+
+
+def mark_ingested(pulls):
+    #pulls are (company, feed) pairs that answered
+    now = time.time()
+    with _connect() as conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO ingested (company, feed, updated) VALUES (?, ?, ?)",
+            [(company, feed, now) for company, feed in pulls],
+        )
+
+
+def prune(days=None):
+    #drops everything older than the window, the FTS rows have to go first while their titles can still be read
+    since = _window_start(days)
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO headlines (headlines, rowid, title) "
+            "SELECT 'delete', id, title FROM articles WHERE published < ?",
+            (since,),
+        )
+        conn.execute(
+            "DELETE FROM mentions WHERE article IN (SELECT id FROM articles WHERE published < ?)",
+            (since,),
+        )
+        return conn.execute("DELETE FROM articles WHERE published < ?", (since,)).rowcount
+
+
+def _pull(source: str, company: str):
+    #None means the source didn't answer (error or no quota left), [] is a real empty feed
+    try:
+        if source == "gnews":
+            if not cache.take_quota("news"):
+                return None
+            return fetch_gnews_articles(company)
+        return list(stream_google_news_rss(company))
+    except Exception as e:
+        print(f"News Error ({source}, {company}): {e}")
+        return None
+
+
+def ingest(companies, workers=None, feeds=FEEDS):
+    #pulls gnews and rss for every company at once over the pooled session, and writes to the index as each feed finishes
+    companies = list(dict.fromkeys(c for c in companies if c))
+    if not companies:
+        return 0
+
+    workers = workers or settings.news_workers
+    added = 0
+    answered = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        jobs = {}
+        for company in companies:
+            for feed in feeds:
+                jobs[pool.submit(_pull, feed, company)] = (company, feed)
+        #only this thread writes, so sqlite never has two writers fighting over the index
+        for job in as_completed(jobs):
+            company, feed = jobs[job]
+            articles = job.result()
+            if articles is None:
+                continue
+            try:
+                added += store(company, articles, feed)
+                answered.add((company, feed))
+            except Exception as e:
+                print(f"News Ingest Error ({company}): {e}")
+
+    #a feed that failed stays stale, so the next request tries it again
+    mark_ingested(answered)
+    prune()
+    return added
+
+
+def last_ingested(company: str, feed: str):
+    row = _connect().execute(
+        "SELECT updated FROM ingested WHERE company = ? AND feed = ?", (company, feed)
+    ).fetchone()
+    return None if row is None else row[0]
+
+
+def stale_feeds(company: str, feeds=FEEDS, fresh_for=0):
+    #feeds that are past their interval now, or will be within fresh_for seconds
+    cutoff = time.time() - settings.source_intervals["news"] + fresh_for
+    return [feed for feed in feeds if (last_ingested(company, feed) or 0) < cutoff]
+
+
+def ensure_fresh(company: str, feeds=FEEDS, fresh_for=0):
+    #only goes to the network for feeds that nothing (scheduler included) has pulled for this company lately
+    stale = stale_feeds(company, feeds, fresh_for)
+    if stale:
+        ingest([company], feeds=stale)
+
+
+def recent_headlines(company: str, days=None, limit=10, rss_only=False):
+    since = _window_start(days)
+    rows = _connect().execute(
+        "SELECT a.title, a.url, a.source, a.published FROM mentions m "
+        "JOIN articles a ON a.id = m.article "
+        "WHERE m.company = ? AND a.published >= ? AND a.via_rss >= ? "
+        "ORDER BY a.published DESC LIMIT ?",
+        (company, since, int(rss_only), limit),
+    ).fetchall()
+    return [{"title": t, "url": u, "source": s, "published": p} for t, u, s, p in rows]
+
+
+def assess_news_risk(company: str, days=None, rss_only=False):
+    #counts the negative headlines in the window with the full-text index, then scores them with risk_engine
+    since = _window_start(days)
+    conn = _connect()
+    total = conn.execute(
+        "SELECT COUNT(*) FROM mentions m JOIN articles a ON a.id = m.article "
+        "WHERE m.company = ? AND a.published >= ? AND a.via_rss >= ?",
+        (company, since, int(rss_only)),
+    ).fetchone()[0]
+    if not total:
+        return {"score": 0, "reasons": []}
+    hits = conn.execute(
+        "SELECT COUNT(*) FROM headlines h "
+        "JOIN articles a ON a.id = h.rowid "
+        "JOIN mentions m ON m.article = a.id "
+        "WHERE headlines MATCH ? AND m.company = ? AND a.published >= ? AND a.via_rss >= ?",
+        (NEGATIVE_QUERY, company, since, int(rss_only)),
+    ).fetchone()[0]
+    return score_news_hits(hits, total)
+
+
+SAMPLE_RSS = b"""<rss><channel><item>
+<title>Apple hit with antitrust lawsuit - Reuters</title>
+<link>https://news.google.com/rss/articles/1</link>
+<pubDate>{pub_date}</pubDate>
+<source url="https://www.reuters.com">Reuters</source>
+</item></channel></rss>"""
+
+
+def self_check():
+    #one story arriving from both gnews and rss must end up as a single article, marked as seen via rss
+    import io
+    import os
+    import tempfile
+    from email.utils import formatdate
+
+    path = os.path.join(tempfile.mkdtemp(), "check.db")
+    settings.news_index_path, original = path, settings.news_index_path
+    _local.conn = None
+    try:
+        now = time.time()
+        store("Apple Inc.", [{"title": "Apple hit with antitrust lawsuit", "url": "https://example.com/a",
+                              "source": "Reuters", "published": now}], "gnews")
+        rss = list(parse_rss(io.BytesIO(SAMPLE_RSS.replace(b"{pub_date}", formatdate(now).encode()))))
+        store("Apple Inc.", rss, "rss")
+
+        rows = _connect().execute("SELECT title, via_rss FROM articles").fetchall()
+        assert rows == [("Apple hit with antitrust lawsuit", 1)], rows
+        assert assess_news_risk("Apple Inc.", rss_only=True)["score"] == 1
+        print("news index check passed: one story from both feeds is stored once")
+    finally:
+        _local.conn.close()
+        _local.conn = None
+        settings.news_index_path = original
+
+
+if __name__ == "__main__":
+    #bulk ingestion: python news_index.py AAPL MSFT ... (defaults to the watchlist)
+    #python news_index.py --check runs the dedupe check against a throwaway index
+    import sys
+    from utils import KNOWN_TICKERS, get_company_info
+
+    if sys.argv[1:] == ["--check"]:
+        self_check()
+        sys.exit(0)
+
+    tickers = [t.upper() for t in sys.argv[1:]] or settings.watchlist or list(KNOWN_TICKERS)
+    names = [get_company_info(t)[0] for t in tickers]
+    start = time.perf_counter()
+    added = ingest(names)
+    print(f"Indexed {added} new headlines for {len(tickers)} tickers in {time.perf_counter() - start:.1f}s")
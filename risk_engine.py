@@ -1,3 +1,13 @@
+# Expanded keyword list to catch general market sentiment
+NEGATIVE_NEWS_KEYWORDS = [
+    "lawsuit", "investigation", "fraud", "recall",
+    "layoffs", "probe", "antitrust", "bankruptcy",
+    "drop", "fall", "decline", "plunge", "tumble", # Price action
+    "miss", "weak", "disappoint", "lower", "cut",  # Earnings
+    "downgrade", "sell", "bearish", "risk", "concern" # Analyst sentiment
+]
+
+
 def assess_financial_risk(yahoo_data: dict, fmp_data: dict):
     score = 0
     reasons = []
@@ -30,32 +40,16 @@ def assess_financial_risk(yahoo_data: dict, fmp_data: dict):
     }
 
 
-def assess_news_risk(news: list):
+def score_news_hits(hits: int, total: int):
     score = 0
     reasons = []
 
-    if not news:
-        return {"score": 0, "reasons": []}
-
-    # Expanded keyword list to catch general market sentiment
-    negative_keywords = [
-        "lawsuit", "investigation", "fraud", "recall",
-        "layoffs", "probe", "antitrust", "bankruptcy",
-        "drop", "fall", "decline", "plunge", "tumble", # Price action
-        "miss", "weak", "disappoint", "lower", "cut",  # Earnings
-        "downgrade", "sell", "bearish", "risk", "concern" # Analyst sentiment
-    ]
-
-    hits = 0
-    for article in news:
-        title = article.get("title", "").lower()
-        if any(word in title for word in negative_keywords):
-            hits += 1
-
-    if hits >= 2:
+    # With a handful of headlines any hit counts, across the full headline index
+    # it takes a real share of the coverage to move the score
+    if hits >= max(2, 0.2 * total):
         score += 2
         reasons.append("Multiple negative news events detected")
-    elif hits >= 1:
+    elif hits >= max(1, 0.1 * total):
         score += 1
         reasons.append("Some negative news coverage detected")
 
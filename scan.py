@@ -0,0 +1,112 @@
+import argparse
+import csv
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import news_index
+from analysis import run_analysis
+from data_sources import set_sec_rate
+from models import AnalysisResult
+from settings import settings
+from utils import KNOWN_TICKERS, get_company_info, sec_ticker_index
+
+COLUMNS = ["ticker", "company", "risk_level", "total_score", "financial", "news", "market", "filings"]
+
+
+def _scan_ticker(ticker: str):
+    #returns (row, missing sources), a plain tuple is all that goes back to the parent
+    try:
+        result = run_analysis(ticker, explain=False, scan=True)
+    except Exception as e:
+        print(f"Scan Error ({ticker}): {e}", file=sys.stderr)
+        return None
+    if not isinstance(result, AnalysisResult):
+        return None
+    scores = result.component_scores
+    return ((
+        result.ticker,
+        result.company_name,
+        result.risk.risk_level,
+        result.risk.total_score,
+        scores["Financial"],
+        scores["News"],
+        scores["Market"],
+        scores["Filings"],
+    ), result.missing)
+
+
+def scan_shard(tickers):
+    #runs inside one worker process, which has its own http session from data_sources.http()
+    #the shard's news comes in as one concurrent batch, so run_analysis finds the index already fresh.
+    #rss only, gnews's daily quota belongs to the dashboard and the scheduler
+    try:
+        news_index.ingest((get_company_info(t)[0] for t in tickers), feeds=("rss",))
+    except Exception as e:
+        print(f"News Ingest Error: {e}", file=sys.stderr)
+    with ThreadPoolExecutor(max_workers=settings.scan_threads) as pool:
+        return [scanned for scanned in pool.map(_scan_ticker, tickers) if scanned]
+
+
+def shard(tickers, count: int):
+    #round robin, so alphabetical clusters of slow tickers don't all land on one worker
+    return [tickers[i::count] for i in range(count) if tickers[i::count]]
+
+
+def scan(tickers, workers=None):
+    workers = workers or settings.scan_workers
+    #a few shards per worker keeps every core busy when some shards finish early
+    shards = shard(list(tickers), workers * 4)
+
+    rows = []
+    skipped = []
+    #every process throttles its own SEC requests to an equal share of the limit
+    sec_share = settings.sec_requests_per_second / workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_sec_rate, initargs=(sec_share,)) as pool:
+        for shard_rows in pool.map(scan_shard, shards):
+            for row, missing in shard_rows:
+                #a failed source would score as zero risk, so those tickers are left out of the ranking
+                if missing:
+                    skipped.append((row[0], missing))
+                else:
+                    rows.append(row)
+
+    #one table, riskiest first
+    rows.sort(key=lambda row: (-row[3], row[0]))
+    skipped.sort()
+    return rows, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score every ticker in the SEC map across all cores")
+    parser.add_argument("tickers", nargs="*", help="tickers to scan (defaults to the whole SEC map)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (defaults to every core)")
+    parser.add_argument("--limit", type=int, default=None, help="only scan the first N tickers")
+    parser.add_argument("--out", default=None, help="write the ranked table to this CSV file")
+    parser.add_argument("--top", type=int, default=25, help="how many rows to print")
+    args = parser.parse_args()
+
+    tickers = [t.upper() for t in args.tickers] or list(sec_ticker_index()) or list(KNOWN_TICKERS)
+    if args.limit:
+        tickers = tickers[: args.limit]
+
+    start = time.perf_counter()
+    rows, skipped = scan(tickers, args.workers)
+    print(f"Scanned {len(rows)}/{len(tickers)} tickers in {time.perf_counter() - start:.1f}s")
+    if skipped:
+        print(f"Not ranked, {len(skipped)} tickers had sources fail:")
+        for ticker, missing in skipped[: args.top]:
+            print(f"  {ticker:<8} {', '.join(missing)}")
+
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            writer.writerows(rows)
+
+    for row in rows[: args.top]:
+        print(f"{row[0]:<8} {row[2]:<7} {row[3]:>3}  {row[1]}")
+
+
+if __name__ == "__main__":
+    main()
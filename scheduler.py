@@ -0,0 +1,117 @@
+import math
+import threading
+
+import cache
+import news_index
+from analysis import run_analysis
+from models import AnalysisResult, encode
+from settings import settings
+from utils import get_company_info, watchlist
+
+WATCHLIST = watchlist()
+
+#how often the scheduler wakes up to look for stale tickers
+POLL_SECONDS = settings.refresh_poll
+
+#fixed cap on the work per wake-up, 0 sizes each pass from the watchlist and the interval
+MAX_PER_PASS = settings.refresh_batch
+
+
+class RefreshScheduler:
+    #re-analyses the watchlist in the background so dashboard loads are cache reads
+
+    def __init__(self, watchlist=None, poll_seconds=POLL_SECONDS, max_per_pass=MAX_PER_PASS):
+        self.watchlist = list(watchlist or WATCHLIST)
+        self.poll_seconds = poll_seconds
+        self.max_per_pass = max_per_pass
+        self._stop = threading.Event()
+        self._thread = None
+
+    def batch_size(self, candidates: int):
+        if self.max_per_pass:
+            return self.max_per_pass
+        #tickers come due once they pass refresh_ahead of their interval, and every one of
+        #them has to be redone in the time that is left before it actually expires
+        window = settings.source_intervals["analysis"] * (1 - settings.refresh_ahead)
+        passes = max(1, int(window // self.poll_seconds))
+        return max(1, math.ceil(candidates / passes))
+
+    def due_tickers(self):
+        #stale tickers first, weighted up by how often people look at them
+        interval = settings.source_intervals["analysis"]
+        hits = cache.popular_tickers()
+        #recently popular tickers that are not on the watchlist get kept warm too
+        candidates = set(self.watchlist) | set(hits)
+
+        due = []
+        for ticker in candidates:
+            age = cache.age("analysis", ticker)
+            staleness = math.inf if age is None else age / interval
+            #refresh ahead of expiry so dashboard loads never see a miss
+            if staleness < settings.refresh_ahead:
+                continue
+            due.append((staleness * (1 + math.log1p(hits.get(ticker, 0))), ticker))
+
+        due.sort(reverse=True)
+        return [ticker for _, ticker in due[: self.batch_size(len(candidates))]]
+
+    def refresh(self, ticker: str):
+        #the new entry is served for a whole analysis interval, so any source that would
+        #expire before then is refetched rather than re-stamped
+        result = run_analysis(ticker, fresh_for=settings.source_intervals["analysis"])
+        if isinstance(result, AnalysisResult):
+            cache.put("analysis", ticker, result, encode=encode)
+        return result
+
+    def run_once(self):
+        refreshed = []
+        due = self.due_tickers()
+        #pull their stale news in one concurrent batch so run_analysis finds the index already fresh
+        try:
+            by_feeds = {}
+            for ticker in due:
+                company = get_company_info(ticker)[0]
+                if company:
+                    stale = news_index.stale_feeds(company, fresh_for=settings.source_intervals["analysis"])
+                    by_feeds.setdefault(tuple(stale), []).append(company)
+            for feeds, companies in by_feeds.items():
+                if feeds:
+                    news_index.ingest(companies, feeds=feeds)
+        except Exception as e:
+            print(f"News Ingest Error: {e}")
+        for ticker in due:
+            if self._stop.is_set():
+                break
+            try:
+                self.refresh(ticker)
+                refreshed.append(ticker)
+            except Exception as e:
+                print(f"Refresh Error ({ticker}): {e}")
+        return refreshed
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            refreshed = self.run_once()
+            if refreshed:
+                print(f"Refreshed {len(refreshed)} tickers: {', '.join(refreshed)}")
+            self._stop.wait(self.poll_seconds)
+
+    def start(self):
+        #in-process mode, the dashboard keeps one of these running in a daemon thread
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="specter-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+if __name__ == "__main__":
+    #separate worker mode: python scheduler.py
+    print(f"Keeping {len(WATCHLIST)} tickers warm every {POLL_SECONDS}s...")
+    try:
+        RefreshScheduler().run_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,76 @@
+import os
+from dotenv import load_dotenv #to acces the .env file with all the API's and their keys
+
+
+class Settings:
+    #everything read from the environment, loaded once and shared by every module
+
+    def __init__(self):
+        load_dotenv()
+
+        # Use UPPERCASE to match your .env file
+        self.alpha_vantage_key = os.getenv("ALPHA_VANTAGE_KEY")
+        self.fmp_key = os.getenv("FMP_KEY")
+        self.gnews_key = os.getenv("GNEWS_KEY")
+        self.fred_key = os.getenv("FRED_KEY")
+        self.gemini_api_key = os.getenv("GEMINI_API_KEY")
+
+        #where the shared cache lives, the dashboard and the refresh worker must point at the same file
+        self.cache_path = os.getenv("SPECTER_CACHE_PATH", "specter_cache.db")
+
+        #the local headline index, how far back news risk looks, and how many feeds are pulled at once
+        self.news_index_path = os.getenv("SPECTER_NEWS_INDEX_PATH", "specter_news.db")
+        self.news_window_days = int(os.getenv("SPECTER_NEWS_WINDOW_DAYS", "7"))
+        self.news_workers = int(os.getenv("SPECTER_NEWS_WORKERS", "8"))
+
+        #connections kept open per process by the shared http session
+        self.http_pool_size = int(os.getenv("SPECTER_HTTP_POOL_SIZE", "16"))
+
+        #universe scan: worker processes (defaults to every core) and tickers fetched at once inside each one
+        self.scan_workers = int(os.getenv("SPECTER_SCAN_WORKERS", "0")) or os.cpu_count() or 1
+        self.scan_threads = int(os.getenv("SPECTER_SCAN_THREADS", "4"))
+        #SEC's fair-access limit is 10 requests a second per IP, shared by every process on the machine
+        self.sec_requests_per_second = float(os.getenv("SPECTER_SEC_RPS", "8"))
+
+        #how much price history to pull, and the most points the price chart is sent
+        self.price_history_period = os.getenv("SPECTER_PRICE_PERIOD", "1y")
+        self.chart_max_points = int(os.getenv("SPECTER_CHART_MAX_POINTS", "400"))
+
+        #comma separated tickers to keep warm, e.g. SPECTER_WATCHLIST=AAPL,MSFT,TSLA (empty means the demo tickers)
+        self.watchlist = [
+            t.strip().upper() for t in os.getenv("SPECTER_WATCHLIST", "").split(",") if t.strip()
+        ]
+        #how often the scheduler wakes up, and how many tickers it refreshes per wake-up (0 sizes it from the watchlist)
+        self.refresh_poll = int(os.getenv("SPECTER_REFRESH_POLL", "60"))
+        self.refresh_batch = int(os.getenv("SPECTER_REFRESH_BATCH", "0"))
+        #share of the analysis interval after which the scheduler refreshes a ticker, so it never actually expires
+        self.refresh_ahead = float(os.getenv("SPECTER_REFRESH_AHEAD", "0.75"))
+        #a ticker viewed more than once within this many seconds is kept warm too, at most popular_max of them
+        self.popular_window = int(os.getenv("SPECTER_POPULAR_WINDOW", str(24 * 60 * 60)))
+        self.popular_max = int(os.getenv("SPECTER_POPULAR_MAX", "100"))
+        #watched tickers are served from the cache up to this old while the scheduler catches up
+        self.max_stale = int(os.getenv("SPECTER_MAX_STALE", str(2 * 15 * 60)))
+        self.background_refresh = os.getenv("SPECTER_BACKGROUND_REFRESH") == "1"
+
+        #how long (in seconds) each source stays fresh before it is fetched again
+        self.source_intervals = {
+            "yahoo": 15 * 60,
+            "alpha_vantage": 6 * 60 * 60,
+            "fmp": 24 * 60 * 60,
+            "news": 30 * 60,
+            "filings": 6 * 60 * 60,
+            "interest_rate": 24 * 60 * 60,
+            "analysis": 15 * 60,
+            "explanation": 24 * 60 * 60, #reused while the scores behind it are unchanged
+        }
+
+        #(calls allowed, window in seconds) for the providers that rate limit us, free tier numbers
+        self.provider_quotas = {
+            "alpha_vantage": (25, 24 * 60 * 60),
+            "fmp": (250, 24 * 60 * 60),
+            "news": (100, 24 * 60 * 60), #gnews is the limited one, rss rides along with it
+            "gemini": (60, 60),
+        }
+
+
+settings = Settings()
@@ -1,5 +1,6 @@
-import requests
-import streamlit as st
+from array import array
+from functools import lru_cache
+from settings import settings
 
 SEC_TICKER_URL = "https://www.sec.gov/files/company_tickers.json"
 
@@ -17,9 +18,17 @@ KNOWN_TICKERS = {
 }
 
 
-@st.cache_data(show_spinner=False)
+def watchlist():
+    #the tickers the scheduler keeps warm, the demo tickers when none are configured
+    return settings.watchlist or list(KNOWN_TICKERS)
+
+
+#kept in memory for the life of the process, without pulling streamlit into workers
+@lru_cache(maxsize=1)
 def load_sec_ticker_map():
     try:
+        import requests
+
         r = requests.get(SEC_TICKER_URL, headers=HEADERS, timeout=20)
         if r.status_code != 200:
             return None
@@ -28,18 +37,57 @@ def load_sec_ticker_map():
         return None
 
 
+@lru_cache(maxsize=1)
+def sec_ticker_index():
+    #ticker -> (company name, cik), so a full universe scan isn't a linear search per ticker
+    data = load_sec_ticker_map() or {}
+    index = {}
+    for item in data.values():
+        ticker = item.get("ticker", "").upper()
+        if ticker and ticker not in index:
+            index[ticker] = (item["title"], str(item["cik_str"]).zfill(10))
+    return index
+
+
 def get_company_info(ticker: str):
     ticker = ticker.upper().strip()
 
-    data = load_sec_ticker_map()
-    if data:
-        for item in data.values():
-            if item.get("ticker", "").upper() == ticker:
-                cik = str(item["cik_str"]).zfill(10)
-                return item["title"], cik, "SEC Live"
+    if ticker in sec_ticker_index():
+        name, cik = sec_ticker_index()[ticker]
+        return name, cik, "SEC Live"
 
     if ticker in KNOWN_TICKERS:
         name, cik = KNOWN_TICKERS[ticker]
         return name, cik, "SEC Fallback"
 
     return None, None, "Not Found"
+
+
+def downsample_lttb(xs, ys, threshold: int):
+    #Largest-Triangle-Three-Buckets: keeps the points that shape the line, so long
+    #histories can be charted with a few hundred points without flattening spikes
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return xs, ys
+
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    keep = [0]
+    for i in range(threshold - 2):
+        #the average of the next bucket is the third corner of the triangle
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(xs[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(ys[avg_start:avg_end]) / (avg_end - avg_start)
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = a + 1, -1.0
+        for j in range(int(i * every) + 1, int((i + 1) * every) + 1):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+
+    return array("d", (xs[k] for k in keep)), array("d", (ys[k] for k in keep))